@@ -0,0 +1,78 @@
+import asyncio
+from typing import Optional
+import aiohttp
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from yarl import URL
+from connectors.ftx.rest.batch import get_batch_calls, get_batch_results
+from connectors.ftx.rest.client import FtxClient
+from connectors.ftx.rest.history import aiter_history, get_windows
+from connectors.transport import DEFAULT_POOL_MAXSIZE, DEFAULT_TIMEOUT, Timeout
+
+
+def _get_client_timeout(timeout: Timeout) -> aiohttp.ClientTimeout:
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+class AsyncFtxClient(FtxClient):
+    def __init__(self, api_key=None, api_secret=None, subaccount_name=None, timeout: Optional[Timeout] = None,
+                 rate_limiter=None, cache=None, limit: int = 4 * DEFAULT_POOL_MAXSIZE,
+                 limit_per_host: int = DEFAULT_POOL_MAXSIZE) -> None:
+        super().__init__(api_key, api_secret, subaccount_name, timeout=timeout, rate_limiter=rate_limiter,
+                         cache=cache)
+        self._client_timeout = _get_client_timeout(DEFAULT_TIMEOUT if timeout is None else timeout)
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._client_session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncFtxClient':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+    def _get_client_session(self) -> aiohttp.ClientSession:
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host,
+                                               ttl_dns_cache=300),
+                timeout=self._client_timeout)
+        return self._client_session
+
+    def _get_cached(self, name, path, params=None):
+        if self._cache is None or not self._cache.is_cached(name):
+            return self._get(path, params)
+        return self._cache.get_or_fetch_async((name, path), lambda: self._get(path, params))
+
+    def _iter_history(self, fetch, start_time, end_time, window, get_time, get_key, max_workers):
+        return aiter_history(fetch, get_windows(start_time, end_time, window), get_time, get_key, max_workers)
+
+    async def execute_order_batch(self, operations, max_workers=64):
+        calls = get_batch_calls(operations)
+        semaphore = asyncio.Semaphore(max_workers)
+        outcomes = await asyncio.gather(*(self._call_limited(semaphore, getattr(self, method), kwargs)
+                                          for method, kwargs, _ in calls), return_exceptions=True)
+        return get_batch_results(calls, outcomes, len(operations))
+
+    async def _call_limited(self, semaphore, method, kwargs):
+        async with semaphore:
+            return await method(**kwargs)
+
+    async def _request(self, method, path, params=None, json=None):
+        await self._rate_limiter.acquire_async(self._get_rate_limit_group(method, path))
+        prepared = self._prepare_request(method, path, params, json)
+        async with self._get_client_session().request(
+                prepared.method, URL(prepared.url, encoded=True), data=prepared.body, headers=prepared.headers) as client_response:
+            response = Response()
+            response.status_code = client_response.status
+            response.reason = client_response.reason
+            response.url = str(client_response.url)
+            response.headers = CaseInsensitiveDict(client_response.headers)
+            response._content = await client_response.read()
+        return self._process_response(response)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+Operation = Dict[str, Any]
+Call = Tuple[str, Dict[str, Any], List[int]]
+
+_MODIFY_DEFAULTS = {'price': None, 'size': None, 'client_id': None}
+_CANCEL_METHODS = {
+    'order_id': ('cancel_order', 'bulk_cancel_orders', 'order_ids'),
+    'client_order_id': ('cancel_order_by_client_id', 'bulk_cancel_orders_by_client_id', 'client_order_ids'),
+}
+
+
+def _get_id_key(operation: Operation) -> str:
+    if 'client_order_id' in operation:
+        return 'client_order_id'
+    if 'order_id' in operation:
+        return 'order_id'
+    raise ValueError(f'{operation["action"]} operation needs an order_id or client_order_id')
+
+
+def get_batch_calls(operations: Sequence[Operation]) -> List[Call]:
+    calls: List[Call] = []
+    cancels: Dict[str, Tuple[List[Any], List[int]]] = {key: ([], []) for key in _CANCEL_METHODS}
+    for index, operation in enumerate(operations):
+        action = operation.get('action')
+        kwargs = {key: value for key, value in operation.items() if key != 'action'}
+        if action == 'place':
+            calls.append(('place_order', kwargs, [index]))
+        elif action == 'modify':
+            method = 'modify_order_by_client_id' if _get_id_key(operation) == 'client_order_id' else 'modify_order'
+            calls.append((method, {**_MODIFY_DEFAULTS, **kwargs}, [index]))
+        elif action == 'cancel':
+            key = _get_id_key(operation)
+            ids, indexes = cancels[key]
+            ids.append(operation[key])
+            indexes.append(index)
+        else:
+            raise ValueError(f'unknown batch action: {action!r}')
+    cancel_calls: List[Call] = []
+    for key, (ids, indexes) in cancels.items():
+        method, bulk_method, bulk_key = _CANCEL_METHODS[key]
+        if len(ids) == 1:
+            cancel_calls.append((method, {key: ids[0]}, indexes))
+        elif ids:
+            cancel_calls.append((bulk_method, {bulk_key: ids}, indexes))
+    return cancel_calls + calls
+
+
+def get_batch_results(calls: List[Call], outcomes: Sequence[Any], size: int) -> List[Any]:
+    results: List[Any] = [None] * size
+    for (_, _, indexes), outcome in zip(calls, outcomes):
+        for index in indexes:
+            results[index] = outcome
+    return results
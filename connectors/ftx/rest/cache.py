@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+_MISSING = object()
+
+
+class ResponseCache:
+    DEFAULT_TTLS = {
+        'get_markets': 60.0,
+        'list_all_futures': 60.0,
+        'get_coins': 3600.0,
+        'get_index_weights': 3600.0,
+        'list_leveraged_tokens': 300.0,
+        'get_borrow_rates': 300.0,
+    }
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, maxsize: int = 256) -> None:
+        self._ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self._maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Any]]' = OrderedDict()
+        self._in_flight: Dict[Tuple, Future] = {}
+        self._in_flight_async: Dict[Tuple, asyncio.Future] = {}
+        self._lock = Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    def is_cached(self, name: str) -> bool:
+        return name in self._ttls
+
+    def _lookup(self, key: Tuple) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        self._stats['hits'] += 1
+        return entry[1]
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self._ttls[key[0]], value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get_or_fetch(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+            else:
+                self._stats['misses'] += 1
+                owned = self._in_flight[key] = Future()
+        if future is not None:
+            return future.result()
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                if self._in_flight.get(key) is owned:
+                    del self._in_flight[key]
+            owned.set_exception(e)
+            raise
+        with self._lock:
+            if self._in_flight.get(key) is owned:
+                self._store(key, value)
+                del self._in_flight[key]
+        owned.set_result(value)
+        return value
+
+    async def get_or_fetch_async(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            future = self._in_flight_async.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+            else:
+                self._stats['misses'] += 1
+                owned = self._in_flight_async[key] = asyncio.get_running_loop().create_future()
+        if future is not None:
+            return await asyncio.shield(future)
+        try:
+            value = await fetch()
+        except BaseException as e:
+            with self._lock:
+                if self._in_flight_async.get(key) is owned:
+                    del self._in_flight_async[key]
+            owned.set_exception(e)
+            owned.exception()
+            raise
+        with self._lock:
+            if self._in_flight_async.get(key) is owned:
+                self._store(key, value)
+                del self._in_flight_async[key]
+        owned.set_result(value)
+        return value
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            for entries in (self._entries, self._in_flight, self._in_flight_async):
+                for key in [key for key in entries if name is None or key[0] == name]:
+                    del entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
@@ -1,20 +1,43 @@
 import time
 import urllib.parse
 import hmac
-from requests import Request, Session, Response
+from json import dumps
+from requests import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+from requests.utils import requote_uri
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from connectors.ftx.rest.batch import get_batch_calls, get_batch_results
+from connectors.ftx.rest.history import get_candle_key, get_candle_time, get_created_at, get_funding_rate_key, \
+    get_item_id, get_item_time, get_windows, iter_history
+from connectors.ftx.rest.rate_limiter import RateLimiter
+from connectors.transport import get_transport
 
 logger = logging.getLogger()
 
 
+def _get_non_null(params):
+    return {key: value for key, value in params.items() if value is not None}
+
+
 class FtxClient:
     _BASE_URL = 'https://ftx.com/api/'
-
-    def __init__(self, api_key=None, api_secret=None, subaccount_name=None):
-        self._session = Session()
+    _ORDER_PATHS = ('orders', 'conditional_orders', 'twap_orders', 'bulk_orders_by_client_id')
+    _HISTORY_PATHS = ('candles', 'trades', 'history', 'fills', 'funding_payments', 'funding_rates')
+
+    def __init__(self, api_key=None, api_secret=None, subaccount_name=None, transport=None, timeout=None,
+                 rate_limiter=None, cache=None):
+        self._cache = cache
+        self._transport = transport or get_transport()
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter or RateLimiter()
         self._api_key = api_key
         self._api_secret = api_secret
         self._subaccount_name = subaccount_name
+        self._base_url = urllib.parse.urlsplit(self._BASE_URL)
+        self._signer = hmac.new(api_secret.encode(), digestmod='sha256') if api_secret else None
+        self._headers = self._get_headers()
+        self._json_headers = CaseInsensitiveDict(self._headers, **{'Content-Type': 'application/json'})
 
         logger.info('FTX client successfully initialized')
 
@@ -27,27 +50,76 @@ class FtxClient:
     def _delete(self, path, params=None):
         return self._request('DELETE', path, json=params)
 
-    def _request(self, method, path, **kwargs):
-        request = Request(method, self._BASE_URL + path, **kwargs)
-        self._sign_request(request)
-        response = self._session.send(request.prepare())
-        return self._process_response(response)
+    def _get_cached(self, name, path, params=None):
+        if self._cache is None or not self._cache.is_cached(name):
+            return self._get(path, params)
+        return self._cache.get_or_fetch((name, path), lambda: self._get(path, params))
+
+    def invalidate_cache(self, name=None):
+        if self._cache is not None:
+            self._cache.invalidate(name)
+
+    def get_cache_stats(self):
+        return self._cache.get_stats() if self._cache is not None else {}
+
+    def _get_rate_limit_group(self, method, path):
+        if method != 'GET' and path.startswith(self._ORDER_PATHS):
+            return 'orders'
+        if method == 'GET' and path.endswith(self._HISTORY_PATHS):
+            return 'history'
+        return 'default'
 
-    def _sign_request(self, request):
-        ts = int(time.time() * 1000)
-        prepared = request.prepare()
-        signature_payload = f'{ts}{prepared.method}{prepared.path_url}'.encode(
-        )
-        if prepared.body:
-            signature_payload += prepared.body
-        signature = hmac.new(self._api_secret.encode(),
-                             signature_payload, 'sha256').hexdigest()
-        request.headers['FTX-KEY'] = self._api_key
-        request.headers['FTX-SIGN'] = signature
-        request.headers['FTX-TS'] = str(ts)
+    def get_rate_limit_stats(self):
+        return self._rate_limiter.get_stats()
+
+    def _get_headers(self):
+        headers = CaseInsensitiveDict(self._transport.get_headers())
+        if self._api_key:
+            headers['FTX-KEY'] = self._api_key
         if self._subaccount_name:
-            request.headers['FTX-SUBACCOUNT'] = urllib.parse.quote(
-                self._subaccount_name)
+            headers['FTX-SUBACCOUNT'] = urllib.parse.quote(self._subaccount_name)
+        return headers
+
+    def _request(self, method, path, params=None, json=None):
+        self._rate_limiter.acquire(self._get_rate_limit_group(method, path))
+        response = self._transport.send_prepared(self._prepare_request(method, path, params, json), self._timeout)
+        return self._process_response(response)
+
+    def _prepare_request(self, method, path, params=None, json=None):
+        path_url = requote_uri(self._base_url.path + path)
+        if params:
+            query = urllib.parse.urlencode(_get_non_null(params), doseq=True)
+            if query:
+                path_url = f'{path_url}?{query}'
+        if json is None:
+            body = None
+            headers = self._headers.copy()
+            if method != 'GET':
+                headers['Content-Length'] = '0'
+        else:
+            body = dumps(_get_non_null(json), allow_nan=False).encode()
+            headers = self._json_headers.copy()
+            headers['Content-Length'] = str(len(body))
+        if self._signer is not None:
+            self._sign_request(headers, method, path_url, body)
+        prepared = PreparedRequest()
+        prepared.method = method
+        prepared.url = f'{self._base_url.scheme}://{self._base_url.netloc}{path_url}'
+        prepared.headers = headers
+        prepared.body = body
+        return prepared
+
+    def _sign_request(self, headers, method, path_url, body):
+        ts = str(int(time.time() * 1000))
+        signer = self._signer.copy()
+        signer.update(f'{ts}{method}{path_url}'.encode())
+        if body:
+            signer.update(body)
+        headers['FTX-SIGN'] = signer.hexdigest()
+        headers['FTX-TS'] = ts
+
+    def _iter_history(self, fetch, start_time, end_time, window, get_time, get_key, max_workers):
+        return iter_history(fetch, get_windows(start_time, end_time, window), get_time, get_key, max_workers)
 
     def _process_response(self, response):
         try:
@@ -136,6 +208,11 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_fills(self, start_time, end_time=None, market=None, order_id=None, window=86400, max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_fills(market, start, end, order_id=order_id),
+            start_time, end_time, window, get_item_time, get_item_id, max_workers)
+
     # Funding Payments
 
     def get_funding_payments(self, start_time=None, end_time=None, future=None):
@@ -147,11 +224,16 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_funding_payments(self, start_time, end_time=None, future=None, window=86400, max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_funding_payments(start, end, future),
+            start_time, end_time, window, get_item_time, get_item_id, max_workers)
+
     # Futures
 
     def list_all_futures(self):
         endpoint = 'futures'
-        return self._get(endpoint)
+        return self._get_cached('list_all_futures', endpoint)
 
     def get_future(self, future_name):
         endpoint = f'futures/{future_name}'
@@ -170,9 +252,14 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_funding_rates(self, start_time, end_time=None, future=None, window=86400, max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_funding_rates(start, end, future),
+            start_time, end_time, window, get_item_time, get_funding_rate_key, max_workers)
+
     def get_index_weights(self, index_name):
         endpoint = f'indexes/{index_name}/weights'
-        return self._get(endpoint)
+        return self._get_cached('get_index_weights', endpoint)
 
     def get_expired_futures(self):
         endpoint = 'expired_futures'
@@ -195,7 +282,7 @@ class FtxClient:
 
     def list_leveraged_tokens(self):
         endpoint = 'lt/tokens'
-        return self._get(endpoint)
+        return self._get_cached('list_leveraged_tokens', endpoint)
 
     def get_token_info(self, token_name):
         endpoint = f'lt/{token_name}'
@@ -233,7 +320,7 @@ class FtxClient:
 
     def get_markets(self):
         endpoint = 'markets'
-        return self._get(endpoint)
+        return self._get_cached('get_markets', endpoint)
 
     def get_single_market(self, market_name, depth=None):
         endpoint = f'markets/{market_name}'
@@ -257,6 +344,11 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_trades(self, market_name, start_time, end_time=None, window=3600, max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_trades(market_name, start, end),
+            start_time, end_time, window, get_item_time, get_item_id, max_workers)
+
     def get_historical_prices(self, market_name, resolution, start_time=None, end_time=None):
         endpoint = f'markets/{market_name}/candles'
         params = {
@@ -266,6 +358,12 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_historical_prices(self, market_name, resolution, start_time, end_time=None, window=None,
+                               max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_historical_prices(market_name, resolution, start, end),
+            start_time, end_time, window or resolution * 1500, get_candle_time, get_candle_key, max_workers)
+
     # NFTs
 
     def list_nfts(self):
@@ -525,6 +623,12 @@ class FtxClient:
         }
         return self._get(endpoint, params)
 
+    def iter_order_history(self, start_time, end_time=None, market=None, side=None, order_type=None, window=86400,
+                           max_workers=4):
+        return self._iter_history(
+            lambda start, end: self.get_order_history(market, side, order_type, start, end),
+            start_time, end_time, window, get_created_at, get_item_id, max_workers)
+
     def get_open_trigger_orders(self, market=None, type=None):
         endpoint = 'conditional_orders'
         params = {
@@ -680,6 +784,15 @@ class FtxClient:
         }
         return self._delete(endpoint, payload)
 
+    def execute_order_batch(self, operations, max_workers=64):
+        calls = get_batch_calls(operations)
+        if not calls:
+            return []
+        with ThreadPoolExecutor(min(max_workers, len(calls))) as executor:
+            futures = [executor.submit(getattr(self, method), **kwargs) for method, kwargs, _ in calls]
+        return get_batch_results(calls, [future.exception() or future.result() for future in futures],
+                                 len(operations))
+
     # Spot Margin
 
     def get_lending_history(self, start_time=None, end_time=None):
@@ -692,7 +805,7 @@ class FtxClient:
 
     def get_borrow_rates(self):
         endpoint = 'spot_margin/borrow_rates'
-        return self._get(endpoint)
+        return self._get_cached('get_borrow_rates', endpoint)
 
     def get_lending_rates(self):
         endpoint = 'spot_margin/lending_rates'
@@ -884,7 +997,7 @@ class FtxClient:
 
     def get_coins(self):
         endpoint = 'wallet/coins'
-        return self._get(endpoint)
+        return self._get_cached('get_coins', endpoint)
 
     def get_balances(self):
         endpoint = 'wallet/balances'
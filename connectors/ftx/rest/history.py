@@ -0,0 +1,172 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, \
+    Optional, Tuple
+import pandas as pd
+
+Fetch = Callable[[float, float], List[Dict]]
+GetTime = Callable[[Dict], float]
+GetKey = Callable[[Dict], Hashable]
+
+
+def parse_time(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def get_item_time(item: Dict) -> float:
+    return parse_time(item['time'])
+
+
+def get_created_at(item: Dict) -> float:
+    return parse_time(item['createdAt'])
+
+
+def get_candle_time(item: Dict) -> float:
+    return item['time'] / 1000
+
+
+def get_item_id(item: Dict) -> Hashable:
+    return item['id']
+
+
+def get_funding_rate_key(item: Dict) -> Hashable:
+    return item['future'], item['time']
+
+
+def get_candle_key(item: Dict) -> Hashable:
+    return item['startTime']
+
+
+def get_windows(start_time: float, end_time: Optional[float], window: float) -> List[Tuple[float, float]]:
+    if end_time is None:
+        end_time = time.time()
+    windows = []
+    while start_time < end_time:
+        windows.append((start_time, min(start_time + window, end_time)))
+        start_time += window
+    return windows
+
+
+class _PageSize:
+    def __init__(self) -> None:
+        self.max = 0
+
+    def is_complete(self, page: List[Dict]) -> bool:
+        if len(page) > self.max:
+            self.max = len(page)
+        return len(page) < self.max
+
+
+def _add_page(items: Dict[Hashable, Dict], page: List[Dict], start_time: float, get_time: GetTime,
+              get_key: GetKey, page_size: _PageSize) -> Optional[float]:
+    added = False
+    for item in page:
+        key = get_key(item)
+        if key not in items:
+            items[key] = item
+            added = True
+    if not added or page_size.is_complete(page):
+        return None
+    oldest = min(get_time(item) for item in page)
+    return oldest if oldest > start_time else None
+
+
+def _sort_window(items: Dict[Hashable, Dict], get_time: GetTime) -> List[Dict]:
+    return sorted(reversed(items.values()), key=get_time)
+
+
+def _fetch_window(fetch: Fetch, start_time: float, end_time: float, get_time: GetTime, get_key: GetKey,
+                  page_size: _PageSize) -> List[Dict]:
+    items: Dict[Hashable, Dict] = {}
+    while end_time is not None:
+        end_time = _add_page(items, fetch(start_time, end_time), start_time, get_time, get_key, page_size)
+    return _sort_window(items, get_time)
+
+
+async def _fetch_window_async(fetch: Callable[[float, float], Awaitable[List[Dict]]], start_time: float,
+                              end_time: float, get_time: GetTime, get_key: GetKey,
+                              page_size: _PageSize) -> List[Dict]:
+    items: Dict[Hashable, Dict] = {}
+    while end_time is not None:
+        end_time = _add_page(items, await fetch(start_time, end_time), start_time, get_time, get_key, page_size)
+    return _sort_window(items, get_time)
+
+
+class _Deduplicator:
+    def __init__(self, get_time: GetTime, get_key: GetKey) -> None:
+        self._get_time = get_time
+        self._get_key = get_key
+        self._boundary_time: Optional[float] = None
+        self._boundary_keys = set()
+
+    def filter(self, items: List[Dict]) -> Iterator[Dict]:
+        for item in items:
+            item_time, key = self._get_time(item), self._get_key(item)
+            if item_time != self._boundary_time:
+                self._boundary_time = item_time
+                self._boundary_keys = set()
+            elif key in self._boundary_keys:
+                continue
+            self._boundary_keys.add(key)
+            yield item
+
+
+def iter_history(fetch: Fetch, windows: List[Tuple[float, float]], get_time: GetTime, get_key: GetKey,
+                 max_workers: int = 4) -> Iterator[Dict]:
+    page_size = _PageSize()
+    deduplicator = _Deduplicator(get_time, get_key)
+    remaining = iter(windows)
+    executor = ThreadPoolExecutor(max_workers)
+    pending: Deque = deque()
+    try:
+        for start_time, end_time in remaining:
+            pending.append(executor.submit(_fetch_window, fetch, start_time, end_time, get_time, get_key, page_size))
+            if len(pending) >= 2 * max_workers:
+                break
+        while pending:
+            items = pending.popleft().result()
+            for start_time, end_time in remaining:
+                pending.append(executor.submit(
+                    _fetch_window, fetch, start_time, end_time, get_time, get_key, page_size))
+                break
+            yield from deduplicator.filter(items)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_history(fetch: Callable[[float, float], Awaitable[List[Dict]]], windows: List[Tuple[float, float]],
+                        get_time: GetTime, get_key: GetKey, max_workers: int = 4) -> AsyncIterator[Dict]:
+    page_size = _PageSize()
+    deduplicator = _Deduplicator(get_time, get_key)
+    remaining = iter(windows)
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        for start_time, end_time in remaining:
+            pending.append(asyncio.ensure_future(
+                _fetch_window_async(fetch, start_time, end_time, get_time, get_key, page_size)))
+            if len(pending) >= max_workers:
+                break
+        while pending:
+            items = await pending.popleft()
+            for start_time, end_time in remaining:
+                pending.append(asyncio.ensure_future(
+                    _fetch_window_async(fetch, start_time, end_time, get_time, get_key, page_size)))
+                break
+            for item in deduplicator.filter(items):
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def to_dataframe(items: Iterable[Dict[str, Any]], time_key: str = 'time') -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(list(items))
+    if time_key in frame:
+        times = frame.pop(time_key)
+        unit = 'ms' if pd.api.types.is_numeric_dtype(times) else None
+        frame.index = pd.DatetimeIndex(pd.to_datetime(times, unit=unit, utc=True), name=time_key)
+        frame = frame.sort_index()
+    return frame
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import deque
+from threading import Condition, Lock
+from typing import Deque, Dict, Iterable, Optional, Tuple
+from connectors.ftx.websocket.latency import LatencyHistogram
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+        self._tokens -= 1
+        return 0.0
+
+
+class _Waiter:
+    __slots__ = ('group', 'priority', 'lane', 'enqueued_at')
+
+    def __init__(self, group: str, priority: bool, lane: Optional[Deque['_Waiter']]) -> None:
+        self.group = group
+        self.priority = priority
+        self.lane = lane
+        self.enqueued_at = time.monotonic()
+
+
+class RateLimiter:
+    _POLL_SECONDS = 0.005
+
+    def __init__(self, rate: float = 30.0, burst: float = 30.0,
+                 group_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 priority_groups: Iterable[str] = ('orders',)) -> None:
+        self._bucket = _TokenBucket(rate, burst)
+        self._group_buckets = {group: _TokenBucket(*limit) for group, limit in (group_limits or {}).items()}
+        self._group_lanes: Dict[str, Deque[_Waiter]] = {group: deque() for group in self._group_buckets}
+        self._lanes: Dict[bool, Deque[_Waiter]] = {True: deque(), False: deque()}
+        self._priority_groups = frozenset(priority_groups)
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._wait_histograms: Dict[str, LatencyHistogram] = {}
+
+    def acquire(self, group: str = 'default') -> float:
+        with self._condition:
+            waiter = self._enqueue(group)
+            try:
+                delay = self._poll(waiter)
+                while delay:
+                    self._condition.wait(delay)
+                    delay = self._poll(waiter)
+            finally:
+                self._dequeue(waiter)
+            return self._record_wait(waiter)
+
+    async def acquire_async(self, group: str = 'default') -> float:
+        with self._lock:
+            waiter = self._enqueue(group)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._poll(waiter)
+                if not delay:
+                    break
+                await asyncio.sleep(min(delay, self._POLL_SECONDS))
+        finally:
+            with self._lock:
+                self._dequeue(waiter)
+        with self._lock:
+            return self._record_wait(waiter)
+
+    def _enqueue(self, group: str) -> _Waiter:
+        priority = group in self._priority_groups
+        lane = self._group_lanes[group] if group in self._group_lanes else self._lanes[priority]
+        waiter = _Waiter(group, priority, lane)
+        lane.append(waiter)
+        return waiter
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        if waiter.lane is not None:
+            waiter.lane.remove(waiter)
+            waiter.lane = None
+            self._condition.notify_all()
+
+    def _poll(self, waiter: _Waiter) -> float:
+        now = time.monotonic()
+        if waiter.group in self._group_lanes and waiter.lane is self._group_lanes[waiter.group]:
+            if waiter.lane[0] is not waiter:
+                return self._POLL_SECONDS
+            delay = self._group_buckets[waiter.group].take(now)
+            if delay:
+                return delay
+            waiter.lane.popleft()
+            waiter.lane = self._lanes[waiter.priority]
+            waiter.lane.append(waiter)
+            self._condition.notify_all()
+        if waiter.lane[0] is not waiter or (not waiter.priority and self._lanes[True]):
+            return self._POLL_SECONDS
+        delay = self._bucket.take(now)
+        if delay:
+            return delay
+        waiter.lane.popleft()
+        waiter.lane = None
+        self._condition.notify_all()
+        return 0.0
+
+    def _record_wait(self, waiter: _Waiter) -> float:
+        wait = time.monotonic() - waiter.enqueued_at
+        histogram = self._wait_histograms.get(waiter.group)
+        if histogram is None:
+            histogram = self._wait_histograms[waiter.group] = LatencyHistogram()
+        histogram.record(wait)
+        return wait
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        depths = {group: len(lane) for group, lane in self._group_lanes.items()}
+        depths['priority'] = len(self._lanes[True])
+        depths['normal'] = len(self._lanes[False])
+        return depths
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                'queued': self.get_queue_depths(),
+                'wait': {group: histogram.get_summary() for group, histogram in self._wait_histograms.items()},
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._wait_histograms.clear()
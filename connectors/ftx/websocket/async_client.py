@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, DefaultDict, Dict, List, Mapping, Optional, Tuple
+import aiohttp
+import numpy as np
+from connectors.ftx.websocket.client import FtxWebSocketClient
+
+logger = logging.getLogger()
+
+
+class AsyncFtxWebSocketClient(FtxWebSocketClient):
+    _HEARTBEAT_SECONDS = 15
+
+    def __init__(self, api_key, api_secret, **kwargs) -> None:
+        super().__init__(api_key, api_secret, **kwargs)
+        self._orderbook_update_events: DefaultDict[str, asyncio.Event] = defaultdict(asyncio.Event)
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        self._run_task: Optional[asyncio.Task] = None
+
+    def send(self, message: str) -> None:
+        self.connect()
+        self._outgoing.put_nowait(message)
+
+    def connect(self) -> None:
+        if self._run_task is None or self._run_task.done():
+            self._run_task = asyncio.get_running_loop().create_task(self._run())
+
+    def reconnect(self) -> None:
+        if self.ws is not None:
+            asyncio.ensure_future(self.ws.close())
+
+    def _schedule_stale_feed_check(self, interval: float, resubscribe: bool) -> None:
+        self._stale_feed_timer = asyncio.get_running_loop().call_later(
+            interval, self._check_stale_feeds, interval, resubscribe)
+
+    async def close(self) -> None:
+        if self._run_task is not None:
+            self._run_task.cancel()
+            try:
+                await self._run_task
+            except asyncio.CancelledError:
+                pass
+            self._run_task = None
+
+    async def _run(self) -> None:
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    ws = await asyncio.wait_for(
+                        session.ws_connect(self._get_url(), heartbeat=self._HEARTBEAT_SECONDS),
+                        self._CONNECT_TIMEOUT_SECONDS)
+                    async with ws:
+                        await self._run_websocket(ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self._record_connect_failure()
+                    logger.warning(f'FTX websocket connection failed: {e}')
+                except Exception:
+                    logger.exception('Unexpected error while running websocket')
+                await asyncio.sleep(self._get_reconnect_delay())
+
+    async def _run_websocket(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while not self._outgoing.empty():
+            self._outgoing.get_nowait()
+        self.ws = ws
+        self._record_connected()
+        self._open_event.set()
+        writer = asyncio.create_task(self._write_messages(ws))
+        try:
+            self._on_open(ws)
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self._on_message(ws, message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    break
+        finally:
+            self.ws = None
+            self._open_event.clear()
+            self._record_disconnected()
+            writer.cancel()
+
+    async def _write_messages(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await ws.send_str(await self._outgoing.get())
+
+    async def get_fills(self) -> List[Dict]:
+        return super().get_fills()
+
+    async def get_order_fills(self, order_id: int) -> List[Dict]:
+        return super().get_order_fills(order_id)
+
+    async def get_orders(self, market: Optional[str] = None) -> Mapping[int, Dict]:
+        return super().get_orders(market)
+
+    async def get_order_by_client_id(self, client_id: str) -> Optional[Dict]:
+        return super().get_order_by_client_id(client_id)
+
+    async def get_orders_since(self, version: int = 0) -> Tuple[int, Dict[int, Optional[Dict]], bool]:
+        return super().get_orders_since(version)
+
+    async def get_trades(self, market: str) -> List[Dict]:
+        return super().get_trades(market)
+
+    async def get_ticker(self, market: str) -> Dict:
+        return super().get_ticker(market)
+
+    async def get_orderbook(self, market: str) -> Mapping[str, Tuple[Tuple[float, float], ...]]:
+        self._ensure_subscribed('orderbook', market)
+        if market not in self._orderbook_snapshots:
+            self._orderbook_snapshot_markets.add(market)
+            if self._orderbook_timestamps[market] == 0:
+                await self.wait_for_orderbook_update(market, 5)
+            else:
+                self._seed_orderbook_snapshot(market)
+        return self._get_orderbook(market)
+
+    async def get_orderbook_array(self, market: str, depth: int) -> Dict[str, np.ndarray]:
+        self._ensure_subscribed('orderbook', market)
+        arrays = self._get_orderbook_array(market, depth)
+        if self._orderbook_timestamps[market] == 0:
+            await self.wait_for_orderbook_update(market, 5)
+        return arrays
+
+    async def wait_for_orderbook_update(self, market: str, timeout: Optional[float]) -> None:
+        self._ensure_subscribed('orderbook', market)
+        try:
+            await asyncio.wait_for(self._orderbook_update_events[market].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def stream(self, channel: str, market: Optional[str] = None, timeout: Optional[float] = None,
+                     maxsize: int = 10000) -> AsyncIterator[Dict]:
+        messages: asyncio.Queue = asyncio.Queue(maxsize)
+
+        def enqueue(message: Dict) -> None:
+            if messages.full():
+                messages.get_nowait()
+            messages.put_nowait(message)
+
+        self.add_callback(channel, enqueue, market)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(messages.get(), timeout)
+                except asyncio.TimeoutError:
+                    return
+        finally:
+            self.remove_callback(channel, enqueue, market)
@@ -0,0 +1,52 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from connectors.ftx.websocket.ring_buffer import RingBuffer
+
+
+class BarAggregator:
+    _COLUMNS = {
+        'time': np.float64, 'open': np.float64, 'high': np.float64, 'low': np.float64, 'close': np.float64,
+        'volume': np.float64, 'vwap': np.float64, 'count': np.int64,
+    }
+
+    def __init__(self, resolution: float, capacity: int = 1000) -> None:
+        self._resolution = resolution
+        self._bars = RingBuffer(capacity, self._COLUMNS)
+        self._current: Optional[List] = None
+
+    def add_trade(self, time: float, price: float, size: float) -> Optional[Dict]:
+        closed = self.roll(time)
+        bar = self._current
+        if bar is None:
+            self._current = [time - time % self._resolution, price, price, price, price, size, price * size, 1]
+        else:
+            if price > bar[2]:
+                bar[2] = price
+            if price < bar[3]:
+                bar[3] = price
+            bar[4] = price
+            bar[5] += size
+            bar[6] += price * size
+            bar[7] += 1
+        return closed
+
+    def roll(self, time: float) -> Optional[Dict]:
+        bar = self._current
+        if bar is None or time < bar[0] + self._resolution:
+            return None
+        self._current = None
+        row = self._to_row(bar)
+        self._bars.append(row)
+        return dict(zip(self._COLUMNS, row))
+
+    def get_current(self) -> Optional[Dict]:
+        bar = self._current
+        return dict(zip(self._COLUMNS, self._to_row(list(bar)))) if bar is not None else None
+
+    def read_since(self, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        return self._bars.read_since(sequence)
+
+    @staticmethod
+    def _to_row(bar: List) -> Tuple:
+        start, open_, high, low, close, volume, notional, count = bar
+        return start, open_, high, low, close, volume, notional / volume if volume else close, count
@@ -1,46 +1,152 @@
 import hmac
 import json
+import logging
 import time
 import zlib
-from collections import defaultdict, deque
+from collections import defaultdict
+from datetime import datetime, timezone
 from itertools import zip_longest
-from typing import DefaultDict, Deque, List, Dict, Tuple, Optional
+from queue import Empty, Full, Queue
+from threading import Timer
+from types import MappingProxyType
+from typing import Any, Callable, DefaultDict, Iterator, List, Dict, Mapping, Set, Tuple, Optional
+import numpy as np
 from gevent.event import Event
+from connectors.ftx.websocket.bars import BarAggregator
+from connectors.ftx.websocket.latency import LatencyHistogram
+from connectors.ftx.websocket.order_store import OrderStore
+from connectors.ftx.websocket.orderbook import CHECKSUM_DEPTH, OrderbookSide
+from connectors.ftx.websocket.recorder import FrameRecorder
+from connectors.ftx.websocket.ring_buffer import RingBuffer
+from connectors.ftx.websocket.shared_memory import SharedOrderbookPublisher
 from connectors.ftx.websocket.websocket_manager import FtxWebSocketManager
 
+logger = logging.getLogger()
+
+try:
+    import orjson
+    _decode_json: Callable[[Any], Dict] = orjson.loads
+except ImportError:
+    _decode_json = json.loads
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _format_time(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
 
 class FtxWebSocketClient(FtxWebSocketManager):
     _ENDPOINT = 'wss://ftx.com/ws/'
+    _PRIVATE_CHANNELS = {'fills', 'orders'}
+    _DERIVED_CHANNELS = {'bars': 'trades'}
+    _BARS_CAPACITY = 1000
+    _EMPTY_ORDERBOOK: Mapping[str, Tuple[Tuple[float, float], ...]] = MappingProxyType({'bids': (), 'asks': ()})
+    _LATENCY_STAGES = ('exchange_lag', 'decode', 'handler')
+    _DEFAULT_STALE_AFTER_SECONDS = 30.0
+    _STALE_AFTER_SECONDS = {'orderbook': 30.0, 'ticker': 30.0}
+    _TRADES_CAPACITY = 10000
+    _FILLS_CAPACITY = 10000
+    _ORDER_CHANGES_CAPACITY = 10000
+    _TRADE_COLUMNS = {
+        'id': np.int64, 'price': np.float64, 'size': np.float64, 'side': np.int8,
+        'liquidation': np.bool_, 'time': np.float64,
+    }
+    _FILL_COLUMNS = {
+        'id': np.int64, 'market': object, 'orderId': np.int64, 'tradeId': np.int64, 'side': np.int8,
+        'price': np.float64, 'size': np.float64, 'fee': np.float64, 'feeRate': np.float64,
+        'liquidity': np.int8, 'time': np.float64, 'feeCurrency': object, 'type': object, 'future': object,
+        'baseCurrency': object, 'quoteCurrency': object,
+    }
 
-    def __init__(self, api_key, api_secret) -> None:
+    def __init__(self, api_key, api_secret, checksum_interval: int = 1,
+                 decoder: Callable[[Any], Dict] = _decode_json, track_latency: bool = True,
+                 imbalance_depth: int = 10, bar_resolutions: Tuple[float, ...] = (1, 15, 60, 300),
+                 stale_after: Optional[Dict[str, float]] = None, order_retention: float = 300.0) -> None:
         super().__init__()
-        self._trades: DefaultDict[str, Deque] = defaultdict(lambda: deque([], maxlen=10000))
-        self._fills: Deque = deque([], maxlen=10000)
+        self._orders = OrderStore(order_retention, self._ORDER_CHANGES_CAPACITY)
+        self._stale_after = dict(self._STALE_AFTER_SECONDS, **(stale_after or {}))
+        self._stale_feeds: Set[Tuple[str, Optional[str]]] = set()
+        self._stale_feed_timer: Optional[Timer] = None
+        self._subscription_times: Dict[Tuple[str, Optional[str]], float] = {}
+        self._bar_resolutions = bar_resolutions
+        self._bar_aggregators: Dict[str, Dict[float, BarAggregator]] = {}
+        self._checksum_interval = checksum_interval
+        self._imbalance_depth = imbalance_depth
+        self._vwap_sizes: Dict[str, float] = {}
+        self._decode = decoder
+        self._track_latency = track_latency
+        self._latency_histograms: DefaultDict[Tuple[str, Optional[str]], Dict[str, LatencyHistogram]] = \
+            defaultdict(lambda: {stage: LatencyHistogram() for stage in self._LATENCY_STAGES})
+        self._latency_report_timer: Optional[Timer] = None
+        self._channel_handlers: Dict[str, Callable[[Dict], None]] = {
+            'orderbook': self._handle_orderbook_message,
+            'trades': self._handle_trades_message,
+            'ticker': self._handle_ticker_message,
+            'fills': self._handle_fills_message,
+            'orders': self._handle_orders_message,
+        }
+        self._trades: DefaultDict[str, RingBuffer] = defaultdict(
+            lambda: RingBuffer(self._TRADES_CAPACITY, self._TRADE_COLUMNS))
+        self._fills = RingBuffer(self._FILLS_CAPACITY, self._FILL_COLUMNS)
+        self._fill_sequences: Dict[int, Tuple[int, ...]] = {}
         self._api_key = api_key
         self._api_secret = api_secret
         self._orderbook_update_events: DefaultDict[str, Event] = defaultdict(Event)
+        self._orderbook_arrays: Dict[str, Dict[int, Dict[str, np.ndarray]]] = {}
+        self._orderbook_array_versions: DefaultDict[str, Dict[int, Tuple[int, int]]] = defaultdict(dict)
+        self._orderbook_snapshot_markets: Set[str] = set()
+        self._orderbook_sequences: DefaultDict[str, int] = defaultdict(int)
+        self._callbacks: DefaultDict[Tuple[str, Optional[str]], List[Callable[[Dict], None]]] = defaultdict(list)
+        self._subscriptions: Dict[Tuple[str, Optional[str]], Dict] = {}
+        self._recorder: Optional[FrameRecorder] = None
+        self._shared_memory_publishers: Dict[str, SharedOrderbookPublisher] = {}
+        self._shared_memory_versions: Dict[str, Tuple[int, int]] = {}
         self._reset_data()
 
     def _on_open(self, ws):
         self._reset_data()
+        subscriptions = list(self._subscriptions.values())
+        self._subscriptions.clear()
+        self.subscribe_many(subscriptions)
 
     def _reset_data(self) -> None:
-        self._subscriptions: List[Dict] = []
-        self._orders: DefaultDict[int, Dict] = defaultdict(dict)
+        self._orders.clear()
         self._tickers: DefaultDict[str, Dict] = defaultdict(dict)
         self._orderbook_timestamps: DefaultDict[str, float] = defaultdict(float)
-        self._orderbook_update_events.clear()
-        self._orderbooks: DefaultDict[str, Dict[str, DefaultDict[float, float]]] = defaultdict(
-            lambda: {side: defaultdict(float) for side in {'bids', 'asks'}})
+        self._orderbooks: DefaultDict[str, Dict[str, OrderbookSide]] = defaultdict(
+            lambda: {'bids': OrderbookSide(descending=True), 'asks': OrderbookSide()})
         self._orderbook_timestamps.clear()
+        self._orderbook_checksums: Dict[str, Tuple[Tuple[int, int], int]] = {}
+        self._orderbook_message_counts: DefaultDict[str, int] = defaultdict(int)
+        self._orderbook_metrics: Dict[str, Dict[str, Optional[float]]] = {}
+        self._orderbook_metric_versions: Dict[str, Tuple[int, int]] = {}
+        self._orderbook_snapshots: Dict[str, Tuple[Tuple[int, int], Mapping[str, Tuple[Tuple[float, float], ...]]]] = {}
         self._logged_in = False
-        self._last_received_orderbook_data_at: float = 0.0
+        self._last_message_times: Dict[Tuple[str, Optional[str]], float] = {}
+        self._orderbook_resyncs: Set[str] = set()
 
     def _reset_orderbook(self, market: str) -> None:
         if market in self._orderbooks:
             del self._orderbooks[market]
         if market in self._orderbook_timestamps:
             del self._orderbook_timestamps[market]
+        if market in self._orderbook_checksums:
+            del self._orderbook_checksums[market]
+        if market in self._orderbook_message_counts:
+            del self._orderbook_message_counts[market]
+        if market in self._orderbook_array_versions:
+            del self._orderbook_array_versions[market]
+        if market in self._orderbook_metrics:
+            del self._orderbook_metrics[market]
+        if market in self._orderbook_metric_versions:
+            del self._orderbook_metric_versions[market]
+        if market in self._shared_memory_versions:
+            del self._shared_memory_versions[market]
+        if market in self._orderbook_snapshots:
+            del self._orderbook_snapshots[market]
 
     def _get_url(self) -> str:
         return self._ENDPOINT
@@ -55,132 +161,559 @@ class FtxWebSocketClient(FtxWebSocketManager):
         }})
         self._logged_in = True
 
+    @staticmethod
+    def _get_subscription_key(subscription: Dict) -> Tuple[str, Optional[str]]:
+        return subscription['channel'], subscription.get('market')
+
     def _subscribe(self, subscription: Dict) -> None:
         self.send_json({'op': 'subscribe', **subscription})
-        self._subscriptions.append(subscription)
+        key = self._get_subscription_key(subscription)
+        self._subscriptions[key] = subscription
+        self._subscription_times[key] = time.time()
 
     def _unsubscribe(self, subscription: Dict) -> None:
         self.send_json({'op': 'unsubscribe', **subscription})
-        while subscription in self._subscriptions:
-            self._subscriptions.remove(subscription)
+        self._subscriptions.pop(self._get_subscription_key(subscription), None)
 
-    def get_fills(self) -> List[Dict]:
-        if not self._logged_in:
-            self._login()
-        subscription = {'channel': 'fills'}
-        if subscription not in self._subscriptions:
-            self._subscribe(subscription)
-        return list(self._fills.copy())
+    def _resubscribe(self, subscription: Dict) -> None:
+        self._unsubscribe(subscription)
+        self._subscribe(subscription)
+
+    def _ensure_subscribed(self, channel: str, market: Optional[str] = None) -> None:
+        if (channel, market) not in self._subscriptions:
+            if channel in self._PRIVATE_CHANNELS and not self._logged_in:
+                self._login()
+            self._subscribe({'channel': channel, 'market': market} if market else {'channel': channel})
 
-    def get_orders(self) -> Dict[int, Dict]:
-        if not self._logged_in:
+    def subscribe_many(self, subscriptions: List[Dict]) -> None:
+        subscriptions = [
+            subscription for key, subscription in
+            {self._get_subscription_key(subscription): subscription for subscription in subscriptions}.items()
+            if key not in self._subscriptions
+        ]
+        if not self._logged_in and any(
+                subscription['channel'] in self._PRIVATE_CHANNELS for subscription in subscriptions):
             self._login()
-        subscription = {'channel': 'orders'}
-        if subscription not in self._subscriptions:
+        for subscription in subscriptions:
             self._subscribe(subscription)
-        return dict(self._orders.copy())
+
+    @staticmethod
+    def _format_fill(row: Tuple) -> Dict:
+        (id, market, order_id, trade_id, side, price, size, fee, fee_rate, liquidity, ts, fee_currency, type,
+         future, base_currency, quote_currency) = row
+        return {
+            'id': id, 'market': market, 'future': future, 'baseCurrency': base_currency,
+            'quoteCurrency': quote_currency, 'type': type, 'orderId': order_id, 'tradeId': trade_id or None,
+            'side': 'buy' if side > 0 else 'sell', 'price': price, 'size': size, 'fee': fee, 'feeRate': fee_rate,
+            'feeCurrency': fee_currency, 'liquidity': 'taker' if liquidity else 'maker', 'time': _format_time(ts),
+        }
+
+    def get_fills(self) -> List[Dict]:
+        self._ensure_subscribed('fills')
+        return [self._format_fill(row) for row in self._fills.iter_rows()]
+
+    def get_fills_since(self, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        self._ensure_subscribed('fills')
+        return self._fills.read_since(sequence)
+
+    def get_order_fills(self, order_id: int) -> List[Dict]:
+        self._ensure_subscribed('fills')
+        rows = (self._fills.get_row(sequence) for sequence in self._fill_sequences.get(order_id, ()))
+        return [self._format_fill(row) for row in rows if row is not None and row[2] == order_id]
+
+    def get_orders(self, market: Optional[str] = None) -> Mapping[int, Dict]:
+        self._ensure_subscribed('orders')
+        return self._orders.get_orders(market)
+
+    def get_order_by_client_id(self, client_id: str) -> Optional[Dict]:
+        self._ensure_subscribed('orders')
+        return self._orders.get_order_by_client_id(client_id)
+
+    def get_orders_since(self, version: int = 0) -> Tuple[int, Dict[int, Optional[Dict]], bool]:
+        self._ensure_subscribed('orders')
+        return self._orders.get_changes_since(version)
 
     def get_trades(self, market: str) -> List[Dict]:
-        subscription = {'channel': 'trades', 'market': market}
-        if subscription not in self._subscriptions:
-            self._subscribe(subscription)
-        return list(self._trades[market].copy())
+        self._ensure_subscribed('trades', market)
+        return [
+            {
+                'id': id, 'price': price, 'size': size, 'side': 'buy' if side > 0 else 'sell',
+                'liquidation': liquidation, 'time': _format_time(ts),
+            }
+            for id, price, size, side, liquidation, ts in self._trades[market].iter_rows()
+        ]
 
-    def get_orderbook(self, market: str) -> Dict[str, List[Tuple[float, float]]]:
-        subscription = {'channel': 'orderbook', 'market': market}
-        if subscription not in self._subscriptions:
-            self._subscribe(subscription)
+    def get_trades_since(self, market: str, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        self._ensure_subscribed('trades', market)
+        return self._trades[market].read_since(sequence)
+
+    def get_orderbook(self, market: str) -> Mapping[str, Tuple[Tuple[float, float], ...]]:
+        self._ensure_subscribed('orderbook', market)
+        if market not in self._orderbook_snapshots:
+            self._orderbook_snapshot_markets.add(market)
+            if self._orderbook_timestamps[market] == 0:
+                self.wait_for_orderbook_update(market, 5)
+            else:
+                self._seed_orderbook_snapshot(market)
+        return self._get_orderbook(market)
+
+    def _get_orderbook(self, market: str) -> Mapping[str, Tuple[Tuple[float, float], ...]]:
+        snapshot = self._orderbook_snapshots.get(market)
+        return snapshot[1] if snapshot else self._EMPTY_ORDERBOOK
+
+    def _read_orderbook(self, market: str, read: Callable[[Dict[str, OrderbookSide]], Any]) -> Any:
+        sequences = self._orderbook_sequences
+        while True:
+            sequence = sequences.get(market, 0)
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            orderbook = self._orderbooks.get(market)
+            if orderbook is None:
+                return None
+            try:
+                result = read(orderbook)
+            except (IndexError, KeyError):
+                continue
+            if sequences.get(market, 0) == sequence:
+                return result
+
+    def _seed_orderbook_snapshot(self, market: str) -> None:
+        snapshot = self._read_orderbook(market, lambda orderbook: (
+            (orderbook['bids'].get_version(), orderbook['asks'].get_version()),
+            MappingProxyType({side: tuple(book.get_levels()) for side, book in orderbook.items()})))
+        if snapshot is not None:
+            self._orderbook_snapshots.setdefault(market, snapshot)
+
+    def _publish_orderbook_snapshot(self, market: str) -> None:
+        orderbook = self._orderbooks[market]
+        version = (orderbook['bids'].get_version(), orderbook['asks'].get_version())
+        snapshot = self._orderbook_snapshots.get(market)
+        if snapshot and snapshot[0] == version:
+            return
+        self._orderbook_snapshots[market] = (version, MappingProxyType({
+            side: snapshot[1][side] if snapshot and snapshot[0][index] == version[index]
+            else tuple(orderbook[side].get_levels())
+            for index, side in enumerate(('bids', 'asks'))
+        }))
+
+    def get_orderbook_array(self, market: str, depth: int) -> Dict[str, np.ndarray]:
+        self._ensure_subscribed('orderbook', market)
+        arrays = self._get_orderbook_array(market, depth)
         if self._orderbook_timestamps[market] == 0:
             self.wait_for_orderbook_update(market, 5)
-        return {
-            side: sorted(
-                [(price, quantity) for price, quantity in list(self._orderbooks[market][side].items())
-                 if quantity],
-                key=lambda order: order[0] * (-1 if side == 'bids' else 1)
-            )
-            for side in {'bids', 'asks'}
+        return arrays
+
+    def _get_orderbook_array(self, market: str, depth: int) -> Dict[str, np.ndarray]:
+        market_arrays = self._orderbook_arrays.get(market, {})
+        if depth in market_arrays:
+            return market_arrays[depth]
+        arrays = {side: np.full((depth, 2), np.nan) for side in ('bids', 'asks')}
+        levels = self._read_orderbook(market, lambda orderbook: {
+            side: orderbook[side].get_levels(depth) for side in arrays})
+        if levels:
+            for side, array in arrays.items():
+                self._fill_orderbook_array(array, levels[side])
+        self._orderbook_arrays[market] = {**market_arrays, depth: arrays}
+        return arrays
+
+    @staticmethod
+    def _fill_orderbook_array(array: np.ndarray, levels: List[Tuple[float, float]]) -> None:
+        if levels:
+            array[:len(levels)] = levels
+        array[len(levels):] = np.nan
+
+    def _refresh_orderbook_arrays(self, market: str) -> None:
+        orderbook = self._orderbooks[market]
+        version = (orderbook['bids'].get_checksum_version(), orderbook['asks'].get_checksum_version())
+        versions = self._orderbook_array_versions[market]
+        for depth, arrays in self._orderbook_arrays[market].items():
+            if depth <= CHECKSUM_DEPTH and versions.get(depth) == version:
+                continue
+            versions[depth] = version
+            for side, array in arrays.items():
+                self._fill_orderbook_array(array, orderbook[side].get_levels(depth))
+
+    def get_orderbook_metrics(self, market: str) -> Dict[str, Optional[float]]:
+        self._ensure_subscribed('orderbook', market)
+        return self._orderbook_metrics.get(market, {})
+
+    def set_vwap_size(self, market: str, size: Optional[float]) -> None:
+        if size:
+            self._vwap_sizes[market] = size
+        else:
+            self._vwap_sizes.pop(market, None)
+        self._orderbook_metric_versions.pop(market, None)
+
+    def _update_orderbook_metrics(self, market: str) -> None:
+        bids, asks = self._orderbooks[market]['bids'], self._orderbooks[market]['asks']
+        vwap_size = self._vwap_sizes.get(market)
+        version = (bids.get_checksum_version(), asks.get_checksum_version())
+        if not vwap_size and self._imbalance_depth <= CHECKSUM_DEPTH and \
+                self._orderbook_metric_versions.get(market) == version:
+            return
+        self._orderbook_metric_versions[market] = version
+        best_bid, best_ask = bids.get_best(), asks.get_best()
+        if best_bid is None or best_ask is None:
+            self._orderbook_metrics[market] = {}
+            return
+        (bid_price, bid_size), (ask_price, ask_size) = best_bid, best_ask
+        bid_depth = bids.get_total_size(self._imbalance_depth)
+        ask_depth = asks.get_total_size(self._imbalance_depth)
+        self._orderbook_metrics[market] = {
+            'bid': bid_price,
+            'ask': ask_price,
+            'mid': (bid_price + ask_price) / 2,
+            'spread': ask_price - bid_price,
+            'microprice': (bid_price * ask_size + ask_price * bid_size) / (bid_size + ask_size),
+            'imbalance': (bid_depth - ask_depth) / (bid_depth + ask_depth),
+            'bid_vwap': bids.get_vwap(vwap_size) if vwap_size else None,
+            'ask_vwap': asks.get_vwap(vwap_size) if vwap_size else None,
         }
 
+    def start_shared_memory_publishing(self, market: str, depth: int = 50, prefix: str = 'ftx') -> None:
+        if market not in self._shared_memory_publishers:
+            self._shared_memory_versions.pop(market, None)
+            self._shared_memory_publishers[market] = SharedOrderbookPublisher(market, depth, prefix)
+        self.subscribe_many([{'channel': 'orderbook', 'market': market}, {'channel': 'ticker', 'market': market}])
+
+    def stop_shared_memory_publishing(self, market: str) -> None:
+        publisher = self._shared_memory_publishers.pop(market, None)
+        self._shared_memory_versions.pop(market, None)
+        if publisher is not None:
+            publisher.close()
+
+    def _publish_shared_orderbook(self, market: str, publisher: SharedOrderbookPublisher) -> None:
+        orderbook = self._orderbooks[market]
+        version = (orderbook['bids'].get_checksum_version(), orderbook['asks'].get_checksum_version())
+        depth = publisher.get_depth()
+        if depth <= CHECKSUM_DEPTH and self._shared_memory_versions.get(market) == version:
+            return
+        self._shared_memory_versions[market] = version
+        publisher.publish_orderbook(
+            orderbook['bids'].get_levels(depth), orderbook['asks'].get_levels(depth),
+            self._orderbook_timestamps[market])
+
     def get_orderbook_timestamp(self, market: str) -> float:
         return self._orderbook_timestamps[market]
 
     def wait_for_orderbook_update(self, market: str, timeout: Optional[float]) -> None:
-        subscription = {'channel': 'orderbook', 'market': market}
-        if subscription not in self._subscriptions:
-            self._subscribe(subscription)
+        self._ensure_subscribed('orderbook', market)
         self._orderbook_update_events[market].wait(timeout)
 
     def get_ticker(self, market: str) -> Dict:
-        subscription = {'channel': 'ticker', 'market': market}
-        if subscription not in self._subscriptions:
-            self._subscribe(subscription)
+        self._ensure_subscribed('ticker', market)
         return self._tickers[market]
 
+    def get_bars(self, market: str, resolution: float, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        return self._ensure_bars_subscribed(market)[resolution].read_since(sequence)
+
+    def get_current_bar(self, market: str, resolution: float) -> Optional[Dict]:
+        return self._ensure_bars_subscribed(market)[resolution].get_current()
+
+    def _ensure_bars_subscribed(self, market: str) -> Dict[float, BarAggregator]:
+        self._ensure_subscribed('trades', market)
+        self._ensure_subscribed('ticker', market)
+        return self._get_bar_aggregators(market)
+
+    def _get_bar_aggregators(self, market: str) -> Dict[float, BarAggregator]:
+        if market not in self._bar_aggregators:
+            self._bar_aggregators[market] = {
+                resolution: BarAggregator(resolution, self._BARS_CAPACITY) for resolution in self._bar_resolutions
+            }
+        return self._bar_aggregators[market]
+
+    def _run_bar_callbacks(self, market: str, resolution: float, bar: Dict) -> None:
+        self._run_callbacks('bars', market, {'channel': 'bars', 'market': market, 'resolution': resolution, 'data': bar})
+
+    def add_callback(self, channel: str, callback: Callable[[Dict], None], market: Optional[str] = None) -> None:
+        source_channel = self._DERIVED_CHANNELS.get(channel, channel)
+        if source_channel in self._PRIVATE_CHANNELS:
+            self._ensure_subscribed(source_channel)
+        elif market:
+            self._ensure_subscribed(source_channel, market)
+        if channel == 'bars' and market:
+            self._ensure_bars_subscribed(market)
+        self._callbacks[(channel, market)] = [*self._callbacks[(channel, market)], callback]
+
+    def remove_callback(self, channel: str, callback: Callable[[Dict], None], market: Optional[str] = None) -> None:
+        callbacks = self._callbacks.get((channel, market))
+        if callbacks and callback in callbacks:
+            self._callbacks[(channel, market)] = [f for f in callbacks if f is not callback]
+
+    def stream(self, channel: str, market: Optional[str] = None, timeout: Optional[float] = None,
+               maxsize: int = 10000) -> Iterator[Dict]:
+        messages: Queue = Queue(maxsize)
+
+        def enqueue(message: Dict) -> None:
+            try:
+                messages.put_nowait(message)
+            except Full:
+                try:
+                    messages.get_nowait()
+                except Empty:
+                    pass
+                messages.put_nowait(message)
+
+        self.add_callback(channel, enqueue, market)
+        try:
+            while True:
+                try:
+                    yield messages.get(timeout=timeout)
+                except Empty:
+                    return
+        finally:
+            self.remove_callback(channel, enqueue, market)
+
+    def _run_callbacks(self, channel: str, market: Optional[str], message: Dict) -> None:
+        for key in ((channel, market), (channel, None)) if market else ((channel, None),):
+            for callback in self._callbacks.get(key, ()):
+                try:
+                    callback(message)
+                except Exception:
+                    logger.exception(f'Error running {channel} callback')
+
     def _handle_orderbook_message(self, message: Dict) -> None:
         market = message['market']
-        subscription = {'channel': 'orderbook', 'market': market}
-        if subscription not in self._subscriptions:
+        if ('orderbook', market) not in self._subscriptions:
             return
         data = message['data']
-        if data['action'] == 'partial':
+        if market in self._orderbook_resyncs:
+            if data['action'] != 'partial':
+                return
+            self._orderbook_resyncs.discard(market)
+        self._orderbook_sequences[market] += 1
+        try:
+            if data['action'] == 'partial':
+                self._reset_orderbook(market)
+            for side in {'bids', 'asks'}:
+                book = self._orderbooks[market][side]
+                for price, size in data[side]:
+                    book.update(price, size)
+                self._orderbook_timestamps[market] = data['time']
+        finally:
+            self._orderbook_sequences[market] += 1
+        message_count = self._orderbook_message_counts[market]
+        self._orderbook_message_counts[market] = message_count + 1
+        if message_count % self._checksum_interval == 0 and \
+                self._get_orderbook_checksum(market) != data['checksum']:
+            self._last_message_times.pop(('orderbook', market), None)
             self._reset_orderbook(market)
-        for side in {'bids', 'asks'}:
-            book = self._orderbooks[market][side]
-            for price, size in data[side]:
-                if size:
-                    book[price] = size
-                else:
-                    del book[price]
-            self._orderbook_timestamps[market] = data['time']
-        checksum = data['checksum']
-        orderbook = self.get_orderbook(market)
-        checksum_data = [
-            ':'.join([f'{float(order[0])}:{float(order[1])}' for order in (bid, offer) if order])
-            for (bid, offer) in zip_longest(orderbook['bids'][:100], orderbook['asks'][:100])
-        ]
-
-        computed_result = int(zlib.crc32(':'.join(checksum_data).encode()))
-        if computed_result != checksum:
-            self._last_received_orderbook_data_at = 0
-            self._reset_orderbook(market)
-            self._unsubscribe({'market': market, 'channel': 'orderbook'})
-            self._subscribe({'market': market, 'channel': 'orderbook'})
+            self._resubscribe({'market': market, 'channel': 'orderbook'})
+            if market in self._orderbook_arrays:
+                self._refresh_orderbook_arrays(market)
         else:
+            self._update_orderbook_metrics(market)
+            if market in self._orderbook_arrays:
+                self._refresh_orderbook_arrays(market)
+            publisher = self._shared_memory_publishers.get(market)
+            if publisher is not None:
+                self._publish_shared_orderbook(market, publisher)
+            if market in self._orderbook_snapshot_markets:
+                self._publish_orderbook_snapshot(market)
             self._orderbook_update_events[market].set()
             self._orderbook_update_events[market].clear()
+            self._run_callbacks('orderbook', market, message)
+
+    def _get_orderbook_checksum(self, market: str) -> int:
+        bids, asks = self._orderbooks[market]['bids'], self._orderbooks[market]['asks']
+        version = (bids.get_checksum_version(), asks.get_checksum_version())
+        cached = self._orderbook_checksums.get(market)
+        if cached and cached[0] == version:
+            return cached[1]
+        checksum_data = [
+            f'{bid}:{ask}' if bid and ask else bid or ask
+            for (bid, ask) in zip_longest(bids.get_checksum_levels(), asks.get_checksum_levels())
+        ]
+        checksum = int(zlib.crc32(':'.join(checksum_data).encode()))
+        self._orderbook_checksums[market] = (version, checksum)
+        return checksum
 
     def _handle_trades_message(self, message: Dict) -> None:
-        self._trades[message['market']].append(message['data'])
+        market = message['market']
+        trades = self._trades[market]
+        aggregators = self._bar_aggregators.get(market)
+        for trade in message['data']:
+            ts = _parse_time(trade['time'])
+            trades.append((
+                trade['id'], trade['price'], trade['size'], 1 if trade['side'] == 'buy' else -1,
+                trade['liquidation'], ts,
+            ))
+            if aggregators:
+                for resolution, aggregator in aggregators.items():
+                    bar = aggregator.add_trade(ts, trade['price'], trade['size'])
+                    if bar is not None:
+                        self._run_bar_callbacks(market, resolution, bar)
+        self._run_callbacks('trades', market, message)
 
     def _handle_ticker_message(self, message: Dict) -> None:
-        self._tickers[message['market']] = message['data']
+        market = message['market']
+        data = message['data']
+        self._tickers[market] = data
+        publisher = self._shared_memory_publishers.get(market)
+        if publisher is not None:
+            publisher.publish_ticker(data)
+        aggregators = self._bar_aggregators.get(market)
+        if aggregators and data.get('time'):
+            for resolution, aggregator in aggregators.items():
+                bar = aggregator.roll(data['time'])
+                if bar is not None:
+                    self._run_bar_callbacks(market, resolution, bar)
+        self._run_callbacks('ticker', market, message)
 
     def _handle_fills_message(self, message: Dict) -> None:
-        self._fills.append(message['data'])
+        fill = message['data']
+        fills, fill_sequences = self._fills, self._fill_sequences
+        sequence = fills.get_sequence()
+        if sequence >= self._FILLS_CAPACITY:
+            evicted = fills.get_row(sequence - self._FILLS_CAPACITY)[2]
+            sequences = fill_sequences.get(evicted)
+            if sequences and sequences[0] == sequence - self._FILLS_CAPACITY:
+                if len(sequences) > 1:
+                    fill_sequences[evicted] = sequences[1:]
+                else:
+                    del fill_sequences[evicted]
+        fill_sequences[fill['orderId']] = fill_sequences.get(fill['orderId'], ()) + (sequence,)
+        fills.append((
+            fill['id'], fill['market'], fill['orderId'], fill.get('tradeId') or 0,
+            1 if fill['side'] == 'buy' else -1, fill['price'], fill['size'], fill['fee'], fill['feeRate'],
+            1 if fill['liquidity'] == 'taker' else 0, _parse_time(fill['time']), fill.get('feeCurrency'),
+            fill.get('type'), fill.get('future'), fill.get('baseCurrency'), fill.get('quoteCurrency'),
+        ))
+        self._run_callbacks('fills', fill['market'], message)
 
     def _handle_orders_message(self, message: Dict) -> None:
         data = message['data']
-        self._orders.update({data['id']: data})
+        self._orders.update(data, time.time())
+        self._run_callbacks('orders', data.get('market'), message)
+
+    def start_recording(self, path: str) -> None:
+        self.stop_recording()
+        self._recorder = FrameRecorder(path)
+
+    def stop_recording(self) -> None:
+        recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def is_stale(self, market: Optional[str], channel: str = 'orderbook', max_age: Optional[float] = None) -> bool:
+        if max_age is None:
+            max_age = self._stale_after.get(channel, self._DEFAULT_STALE_AFTER_SECONDS)
+        return time.time() - self._last_message_times.get((channel, market), 0.0) > max_age
+
+    def get_stale_feeds(self) -> List[Tuple[str, Optional[str]]]:
+        return list(self._stale_feeds)
+
+    def start_stale_feed_watchdog(self, interval: float = 1.0, resubscribe: bool = True) -> None:
+        self.stop_stale_feed_watchdog()
+        self._schedule_stale_feed_check(interval, resubscribe)
+
+    def _schedule_stale_feed_check(self, interval: float, resubscribe: bool) -> None:
+        self._stale_feed_timer = Timer(interval, self._check_stale_feeds, args=(interval, resubscribe))
+        self._stale_feed_timer.daemon = True
+        self._stale_feed_timer.start()
+
+    def _check_stale_feeds(self, interval: float, resubscribe: bool) -> None:
+        now = time.time()
+        for key, subscription in list(self._subscriptions.items()):
+            channel, market = key
+            max_age = self._stale_after.get(channel)
+            if max_age is None:
+                continue
+            last_message_time = self._last_message_times.get(key, 0.0)
+            if now - max(last_message_time, self._subscription_times.get(key, 0.0)) <= max_age:
+                if now - last_message_time <= max_age:
+                    self._stale_feeds.discard(key)
+                continue
+            if key not in self._stale_feeds:
+                self._stale_feeds.add(key)
+                logger.warning(f'FTX websocket {channel} {market or ""} feed is stale')
+            if resubscribe and self.ws is not None:
+                if channel == 'orderbook':
+                    self._orderbook_resyncs.add(market)
+                self._resubscribe(subscription)
+        if self._stale_feed_timer is not None:
+            self._schedule_stale_feed_check(interval, resubscribe)
+
+    def stop_stale_feed_watchdog(self) -> None:
+        timer, self._stale_feed_timer = self._stale_feed_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def get_latency_stats(self, channel: Optional[str] = None,
+                          market: Optional[str] = None) -> Dict[Tuple[str, Optional[str]], Dict[str, Dict]]:
+        return {
+            key: {stage: histogram.get_summary() for stage, histogram in histograms.items()}
+            for key, histograms in list(self._latency_histograms.items())
+            if (channel is None or key[0] == channel) and (market is None or key[1] == market)
+        }
+
+    def reset_latency_stats(self) -> None:
+        for histograms in list(self._latency_histograms.values()):
+            for histogram in histograms.values():
+                histogram.reset()
+
+    def start_latency_reporting(self, interval: float) -> None:
+        self.stop_latency_reporting()
+        self._schedule_latency_report(interval)
+
+    def _schedule_latency_report(self, interval: float) -> None:
+        self._latency_report_timer = Timer(interval, self._report_latency, args=(interval,))
+        self._latency_report_timer.daemon = True
+        self._latency_report_timer.start()
+
+    def _report_latency(self, interval: float) -> None:
+        for (channel, market), stages in self.get_latency_stats().items():
+            logger.info(f'FTX websocket latency {channel} {market or ""}: {stages}')
+        if self._latency_report_timer is not None:
+            self._schedule_latency_report(interval)
+
+    def stop_latency_reporting(self) -> None:
+        timer, self._latency_report_timer = self._latency_report_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _record_latency(self, message: Dict, received_at: float, decode_seconds: float,
+                        handler_seconds: float) -> None:
+        channel = message['channel']
+        data = message['data']
+        if channel == 'fills' or channel == 'orders':
+            market = data.get('market')
+        else:
+            market = message.get('market')
+        histograms = self._latency_histograms[(channel, market)]
+        histograms['decode'].record(decode_seconds)
+        histograms['handler'].record(handler_seconds)
+        if channel == 'orderbook' or channel == 'ticker':
+            exchange_time = data.get('time')
+        elif channel == 'trades':
+            exchange_time = _parse_time(data[-1]['time']) if data else None
+        elif channel == 'fills':
+            exchange_time = _parse_time(data['time'])
+        else:
+            exchange_time = None
+        if exchange_time:
+            histograms['exchange_lag'].record(received_at - exchange_time)
 
     def _on_message(self, ws, raw_message: str) -> None:
-        message = json.loads(raw_message)
+        received_at = time.time()
+        if self._recorder is not None:
+            self._recorder.record(received_at, raw_message)
+        started_at = time.perf_counter()
+        message = self._decode(raw_message)
+        decoded_at = time.perf_counter()
         message_type = message['type']
-        if message_type in {'subscribed', 'unsubscribed'}:
-            return
+        if message_type == 'update' or message_type == 'partial':
+            channel = message['channel']
+            self._last_message_times[(channel, message.get('market'))] = received_at
+            handler = self._channel_handlers.get(channel)
+            if handler:
+                handler(message)
+                if self._track_latency:
+                    self._record_latency(
+                        message, received_at, decoded_at - started_at, time.perf_counter() - decoded_at)
         elif message_type == 'info':
             if message['code'] == 20001:
                 return self.reconnect()
         elif message_type == 'error':
             raise Exception(message)
-        channel = message['channel']
-
-        if channel == 'orderbook':
-            self._handle_orderbook_message(message)
-        elif channel == 'trades':
-            self._handle_trades_message(message)
-        elif channel == 'ticker':
-            self._handle_ticker_message(message)
-        elif channel == 'fills':
-            self._handle_fills_message(message)
-        elif channel == 'orders':
-            self._handle_orders_message(message)
@@ -0,0 +1,70 @@
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    def __init__(self, max_seconds: float = 60.0, significant_bits: int = 5) -> None:
+        self._half_count = 1 << (significant_bits - 1)
+        self._significant_bits = significant_bits
+        self._max_value = int(max_seconds * 1e6)
+        self._counts: List[int] = [0] * (self._get_index(self._max_value) + 1)
+        self._count = 0
+        self._total = 0
+        self._min = 0
+        self._max = 0
+
+    def _get_index(self, value: int) -> int:
+        shift = value.bit_length() - self._significant_bits
+        if shift <= 0:
+            return value
+        return shift * self._half_count + (value >> shift)
+
+    def _get_value(self, index: int) -> int:
+        if index < 2 * self._half_count:
+            return index
+        shift = index // self._half_count - 1
+        return ((index - shift * self._half_count + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value = int(seconds * 1e6)
+        if value < 0:
+            value = 0
+        elif value > self._max_value:
+            value = self._max_value
+        shift = value.bit_length() - self._significant_bits
+        self._counts[value if shift <= 0 else shift * self._half_count + (value >> shift)] += 1
+        if value > self._max:
+            self._max = value
+        if value < self._min or not self._count:
+            self._min = value
+        self._count += 1
+        self._total += value
+
+    def reset(self) -> None:
+        self._counts = [0] * len(self._counts)
+        self._count = self._total = self._min = self._max = 0
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_percentile(self, percentile: float) -> float:
+        if not self._count:
+            return 0.0
+        threshold = self._count * percentile / 100
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= threshold:
+                return min(self._get_value(index), self._max) / 1e6
+        return self._max / 1e6
+
+    def get_summary(self) -> Dict[str, float]:
+        return {
+            'count': self._count,
+            'min': self._min / 1e6,
+            'mean': self._total / self._count / 1e6 if self._count else 0.0,
+            'p50': self.get_percentile(50),
+            'p90': self.get_percentile(90),
+            'p99': self.get_percentile(99),
+            'p99.9': self.get_percentile(99.9),
+            'max': self._max / 1e6,
+        }
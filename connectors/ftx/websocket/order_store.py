@@ -0,0 +1,100 @@
+from collections import deque
+from types import MappingProxyType
+from typing import Deque, Dict, Iterable, Mapping, Optional, Tuple
+import numpy as np
+from connectors.ftx.websocket.ring_buffer import RingBuffer
+
+_EMPTY_ORDERS: Mapping[int, Dict] = MappingProxyType({})
+
+
+class OrderStore:
+    def __init__(self, retention: float = 300.0, changes_capacity: int = 10000) -> None:
+        self._retention = retention
+        self._changes = RingBuffer(changes_capacity, {'id': np.int64})
+        self.clear()
+
+    def clear(self) -> None:
+        self._orders = _EMPTY_ORDERS
+        self._orders_by_market: Dict[str, Mapping[int, Dict]] = {}
+        self._ids_by_client_id: Dict[str, int] = {}
+        self._closed: Deque[Tuple[float, int]] = deque()
+        self._expiries: Dict[int, float] = {}
+        self._reset_version = self._changes.get_sequence()
+
+    def get_version(self) -> int:
+        return self._changes.get_sequence()
+
+    def get_orders(self, market: Optional[str] = None) -> Mapping[int, Dict]:
+        if market is None:
+            return self._orders
+        return self._orders_by_market.get(market, _EMPTY_ORDERS)
+
+    def get_order(self, order_id: int) -> Optional[Dict]:
+        return self._orders.get(order_id)
+
+    def get_order_by_client_id(self, client_id: str) -> Optional[Dict]:
+        order_id = self._ids_by_client_id.get(client_id)
+        return self._orders.get(order_id) if order_id is not None else None
+
+    def get_changes_since(self, version: int = 0) -> Tuple[int, Dict[int, Optional[Dict]], bool]:
+        end, views = self._changes.read_since(version)
+        orders = self._orders
+        if version <= self._reset_version or version < end - len(self._changes):
+            return end, dict(orders), True
+        return end, {order_id: orders.get(order_id) for order_id in dict.fromkeys(views['id'].tolist())}, False
+
+    def update(self, order: Dict, now: float) -> None:
+        order_id = order['id']
+        market = order['market']
+        orders = dict(self._orders)
+        orders[order_id] = order
+        market_orders = dict(self._orders_by_market.get(market, _EMPTY_ORDERS))
+        market_orders[order_id] = order
+        self._orders = MappingProxyType(orders)
+        self._orders_by_market[market] = MappingProxyType(market_orders)
+        if order.get('clientId'):
+            self._ids_by_client_id[order['clientId']] = order_id
+        if order['status'] == 'closed':
+            expiry = self._expiries[order_id] = now + self._retention
+            self._closed.append((expiry, order_id))
+        self._changes.append((order_id,))
+        if self._closed and self._closed[0][0] <= now:
+            self.evict(now)
+
+    def evict(self, now: float) -> None:
+        closed, expiries, orders = self._closed, self._expiries, self._orders
+        expired = []
+        while closed and closed[0][0] <= now:
+            expiry, order_id = closed.popleft()
+            if expiries.get(order_id) != expiry:
+                continue
+            del expiries[order_id]
+            order = orders.get(order_id)
+            if order is not None and order['status'] == 'closed':
+                expired.append(order)
+        if expired:
+            self._remove(expired)
+
+    def _remove(self, expired: Iterable[Dict]) -> None:
+        orders = dict(self._orders)
+        markets: Dict[str, Dict[int, Dict]] = {}
+        removed = []
+        for order in expired:
+            order_id = order['id']
+            if orders.pop(order_id, None) is None:
+                continue
+            removed.append(order_id)
+            market = order['market']
+            if market not in markets:
+                markets[market] = dict(self._orders_by_market[market])
+            del markets[market][order_id]
+            if self._ids_by_client_id.get(order.get('clientId')) == order_id:
+                del self._ids_by_client_id[order['clientId']]
+        self._orders = MappingProxyType(orders)
+        for market, market_orders in markets.items():
+            if market_orders:
+                self._orders_by_market[market] = MappingProxyType(market_orders)
+            else:
+                del self._orders_by_market[market]
+        for order_id in removed:
+            self._changes.append((order_id,))
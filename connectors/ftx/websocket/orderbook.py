@@ -0,0 +1,97 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+CHECKSUM_DEPTH = 100
+
+
+class OrderbookSide:
+    def __init__(self, descending: bool = False, checksum_depth: int = CHECKSUM_DEPTH) -> None:
+        self._descending = descending
+        self._prices: List[float] = []
+        self._sizes: Dict[float, float] = {}
+        self._checksum_depth = checksum_depth
+        self._checksum_strings: Dict[float, str] = {}
+        self._checksum_levels: List[str] = []
+        self._checksum_version = 0
+        self._version = 0
+        self._checksum_levels_version = -1
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __contains__(self, price: float) -> bool:
+        return price in self._sizes
+
+    def clear(self) -> None:
+        self._prices.clear()
+        self._sizes.clear()
+        self._checksum_strings.clear()
+        self._checksum_version += 1
+        self._version += 1
+
+    def update(self, price: float, size: float) -> None:
+        prices = self._prices
+        index = bisect_left(prices, price)
+        if size:
+            if price not in self._sizes:
+                prices.insert(index, price)
+            self._sizes[price] = size
+            self._checksum_strings[price] = f'{float(price)}:{float(size)}'
+            rank = len(prices) - 1 - index if self._descending else index
+        elif self._sizes.pop(price, None) is not None:
+            del prices[index]
+            del self._checksum_strings[price]
+            rank = len(prices) - index if self._descending else index
+        else:
+            return
+        self._version += 1
+        if rank < self._checksum_depth:
+            self._checksum_version += 1
+
+    def get_size(self, price: float) -> float:
+        return self._sizes.get(price, 0.0)
+
+    def get_best(self) -> Optional[Tuple[float, float]]:
+        if not self._prices:
+            return None
+        price = self._prices[-1] if self._descending else self._prices[0]
+        return price, self._sizes[price]
+
+    def get_prices(self, depth: Optional[int] = None) -> List[float]:
+        if depth is None:
+            depth = len(self._prices)
+        if self._descending:
+            return self._prices[-1:-depth - 1:-1] if depth > 0 else []
+        return self._prices[:max(depth, 0)]
+
+    def get_levels(self, depth: Optional[int] = None) -> List[Tuple[float, float]]:
+        sizes = self._sizes
+        return [(price, sizes[price]) for price in self.get_prices(depth)]
+
+    def get_total_size(self, depth: int) -> float:
+        sizes = self._sizes
+        return sum(sizes[price] for price in self.get_prices(depth))
+
+    def get_vwap(self, size: float) -> Optional[float]:
+        remaining = size
+        notional = 0.0
+        for price in reversed(self._prices) if self._descending else self._prices:
+            filled = min(self._sizes[price], remaining)
+            notional += filled * price
+            remaining -= filled
+            if remaining <= 0:
+                return notional / size
+        return None
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get_checksum_version(self) -> int:
+        return self._checksum_version
+
+    def get_checksum_levels(self) -> List[str]:
+        if self._checksum_levels_version != self._checksum_version:
+            strings = self._checksum_strings
+            self._checksum_levels = [strings[price] for price in self.get_prices(self._checksum_depth)]
+            self._checksum_levels_version = self._checksum_version
+        return self._checksum_levels
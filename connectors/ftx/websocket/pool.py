@@ -0,0 +1,124 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, DefaultDict, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+from connectors.ftx.websocket.client import FtxWebSocketClient
+
+
+class FtxWebSocketPool:
+    _CHANNEL_WEIGHTS = {'orderbook': 4, 'trades': 2, 'ticker': 1}
+
+    def __init__(self, api_key, api_secret, connections: int = 4, **client_kwargs) -> None:
+        assert connections > 0, 'a pool needs at least one public connection'
+        self._clients: List[FtxWebSocketClient] = [
+            FtxWebSocketClient(api_key, api_secret, **client_kwargs) for _ in range(connections)
+        ]
+        self._private_client = FtxWebSocketClient(api_key, api_secret, **client_kwargs)
+        self._assignments: Dict[Tuple[str, str], FtxWebSocketClient] = {}
+        self._loads: DefaultDict[int, int] = defaultdict(int)
+        self._assignment_lock = Lock()
+
+    def _get_client(self, channel: str, market: Optional[str] = None) -> FtxWebSocketClient:
+        channel = FtxWebSocketClient._DERIVED_CHANNELS.get(channel, channel)
+        if channel in FtxWebSocketClient._PRIVATE_CHANNELS:
+            return self._private_client
+        client = self._assignments.get((channel, market))
+        if client is None:
+            with self._assignment_lock:
+                client = self._assignments.get((channel, market))
+                if client is None:
+                    index = min(range(len(self._clients)), key=self._loads.__getitem__)
+                    self._loads[index] += self._CHANNEL_WEIGHTS.get(channel, 1)
+                    client = self._assignments[(channel, market)] = self._clients[index]
+        return client
+
+    def _get_clients(self, channel: str, market: Optional[str] = None) -> List[FtxWebSocketClient]:
+        if FtxWebSocketClient._DERIVED_CHANNELS.get(channel, channel) in FtxWebSocketClient._PRIVATE_CHANNELS:
+            return [self._private_client]
+        if market:
+            return [self._get_client(channel, market)]
+        return self._clients
+
+    def subscribe_many(self, subscriptions: List[Dict]) -> None:
+        batches: DefaultDict[FtxWebSocketClient, List[Dict]] = defaultdict(list)
+        for subscription in subscriptions:
+            batches[self._get_client(subscription['channel'], subscription.get('market'))].append(subscription)
+        for client, batch in batches.items():
+            client.subscribe_many(batch)
+
+    def get_fills(self) -> List[Dict]:
+        return self._private_client.get_fills()
+
+    def get_fills_since(self, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        return self._private_client.get_fills_since(sequence)
+
+    def get_order_fills(self, order_id: int) -> List[Dict]:
+        return self._private_client.get_order_fills(order_id)
+
+    def get_orders(self, market: Optional[str] = None) -> Mapping[int, Dict]:
+        return self._private_client.get_orders(market)
+
+    def get_order_by_client_id(self, client_id: str) -> Optional[Dict]:
+        return self._private_client.get_order_by_client_id(client_id)
+
+    def get_orders_since(self, version: int = 0) -> Tuple[int, Dict[int, Optional[Dict]], bool]:
+        return self._private_client.get_orders_since(version)
+
+    def get_trades(self, market: str) -> List[Dict]:
+        return self._get_client('trades', market).get_trades(market)
+
+    def get_trades_since(self, market: str, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        return self._get_client('trades', market).get_trades_since(market, sequence)
+
+    def get_bars(self, market: str, resolution: float, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        return self._get_client('trades', market).get_bars(market, resolution, sequence)
+
+    def get_current_bar(self, market: str, resolution: float) -> Optional[Dict]:
+        return self._get_client('trades', market).get_current_bar(market, resolution)
+
+    def get_orderbook(self, market: str) -> Mapping[str, Tuple[Tuple[float, float], ...]]:
+        return self._get_client('orderbook', market).get_orderbook(market)
+
+    def get_orderbook_array(self, market: str, depth: int) -> Dict[str, np.ndarray]:
+        return self._get_client('orderbook', market).get_orderbook_array(market, depth)
+
+    def get_orderbook_metrics(self, market: str) -> Dict[str, Optional[float]]:
+        return self._get_client('orderbook', market).get_orderbook_metrics(market)
+
+    def set_vwap_size(self, market: str, size: Optional[float]) -> None:
+        self._get_client('orderbook', market).set_vwap_size(market, size)
+
+    def get_orderbook_timestamp(self, market: str) -> float:
+        return self._get_client('orderbook', market).get_orderbook_timestamp(market)
+
+    def wait_for_orderbook_update(self, market: str, timeout: Optional[float]) -> None:
+        self._get_client('orderbook', market).wait_for_orderbook_update(market, timeout)
+
+    def get_ticker(self, market: str) -> Dict:
+        return self._get_client('ticker', market).get_ticker(market)
+
+    def is_stale(self, market: Optional[str], channel: str = 'orderbook', max_age: Optional[float] = None) -> bool:
+        return self._get_client(channel, market).is_stale(market, channel, max_age)
+
+    def get_latency_stats(self, channel: Optional[str] = None,
+                          market: Optional[str] = None) -> Dict[Tuple[str, Optional[str]], Dict[str, Dict]]:
+        stats = {}
+        for client in [self._private_client, *self._clients]:
+            for key, stages in client.get_latency_stats(channel, market).items():
+                if self._assignments.get(key, client) is client:
+                    stats[key] = stages
+        return stats
+
+    def reset_latency_stats(self) -> None:
+        for client in [self._private_client, *self._clients]:
+            client.reset_latency_stats()
+
+    def add_callback(self, channel: str, callback: Callable[[Dict], None], market: Optional[str] = None) -> None:
+        for client in self._get_clients(channel, market):
+            client.add_callback(channel, callback, market)
+
+    def remove_callback(self, channel: str, callback: Callable[[Dict], None], market: Optional[str] = None) -> None:
+        for client in self._get_clients(channel, market):
+            client.remove_callback(channel, callback, market)
+
+    stream = FtxWebSocketClient.stream
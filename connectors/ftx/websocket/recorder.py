@@ -0,0 +1,29 @@
+import gzip
+from threading import Lock
+from typing import Iterator, Tuple, Union
+
+
+class FrameRecorder:
+    def __init__(self, path: str) -> None:
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = Lock()
+
+    def record(self, received_at: float, frame: Union[str, bytes]) -> None:
+        if isinstance(frame, bytes):
+            frame = frame.decode()
+        with self._lock:
+            if self._file is not None:
+                self._file.write(f'{received_at!r}\t{frame}\n')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str]]:
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            received_at, frame = line.rstrip('\n').split('\t', 1)
+            yield float(received_at), frame
@@ -0,0 +1,42 @@
+import time
+from typing import Dict
+from connectors.ftx.websocket.client import FtxWebSocketClient
+from connectors.ftx.websocket.recorder import read_frames
+
+
+class FtxWebSocketReplayClient(FtxWebSocketClient):
+    def __init__(self, api_key=None, api_secret=None, **kwargs) -> None:
+        super().__init__(api_key, api_secret, **kwargs)
+
+    def send(self, message: str) -> None:
+        pass
+
+    def connect(self) -> None:
+        pass
+
+    def reconnect(self) -> None:
+        pass
+
+    def _login(self) -> None:
+        self._logged_in = True
+
+    def _handle_orderbook_message(self, message: Dict) -> None:
+        market = message['market']
+        if ('orderbook', market) not in self._subscriptions:
+            self._subscriptions[('orderbook', market)] = {'channel': 'orderbook', 'market': market}
+        super()._handle_orderbook_message(message)
+
+    def replay(self, path: str, realtime: bool = False) -> int:
+        count = 0
+        started_at = time.monotonic()
+        first_received_at = None
+        for received_at, frame in read_frames(path):
+            if realtime:
+                if first_received_at is None:
+                    first_received_at = received_at
+                delay = (received_at - first_received_at) - (time.monotonic() - started_at)
+                if delay > 0:
+                    time.sleep(delay)
+            self._on_message(None, frame)
+            count += 1
+        return count
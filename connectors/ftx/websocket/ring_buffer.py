@@ -0,0 +1,46 @@
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity: int, columns: Dict[str, Any]) -> None:
+        self._capacity = capacity
+        self._names = tuple(columns)
+        self._columns = {name: np.zeros(2 * capacity, dtype) for name, dtype in columns.items()}
+        self._column_list = [self._columns[name] for name in self._names]
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return min(self._sequence, self._capacity)
+
+    def get_sequence(self) -> int:
+        return self._sequence
+
+    def append(self, row: Sequence) -> None:
+        index = self._sequence % self._capacity
+        mirror = index + self._capacity
+        for column, value in zip(self._column_list, row):
+            column[index] = value
+            column[mirror] = value
+        self._sequence += 1
+
+    def get_row(self, sequence: int) -> Optional[Tuple]:
+        if not self._sequence - self._capacity <= sequence < self._sequence:
+            return None
+        index = sequence % self._capacity
+        return tuple(column.item(index) for column in self._column_list)
+
+    def read_since(self, sequence: int = 0) -> Tuple[int, Dict[str, np.ndarray]]:
+        end = self._sequence
+        start = min(max(sequence, end - self._capacity), end)
+        offset = start % self._capacity
+        views = {}
+        for name, column in self._columns.items():
+            view = column[offset:offset + end - start]
+            view.flags.writeable = False
+            views[name] = view
+        return end, views
+
+    def iter_rows(self, sequence: int = 0) -> Iterator[Tuple]:
+        _, views = self.read_since(sequence)
+        return zip(*(views[name].tolist() for name in self._names))
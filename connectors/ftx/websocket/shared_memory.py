@@ -0,0 +1,120 @@
+import os
+import re
+import sys
+from multiprocessing import parent_process, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_HEADER_SIZE = 3
+_TICKER_FIELDS = ('bid', 'ask', 'bidSize', 'askSize', 'last', 'time')
+
+
+def get_shared_memory_name(market: str, prefix: str = 'ftx') -> str:
+    return f'{prefix}_{re.sub(r"[^0-9A-Za-z]", "_", market)}'
+
+
+def _get_size(depth: int) -> int:
+    return 8 * (_HEADER_SIZE + len(_TICKER_FIELDS) + 1 + 4 * depth)
+
+
+def _is_own_process_tree(pid: int) -> bool:
+    parent = parent_process()
+    return pid == os.getpid() or (parent is not None and pid == parent.pid)
+
+
+def _get_views(buffer, depth: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    header = np.ndarray((_HEADER_SIZE,), np.int64, buffer)
+    offset = 8 * _HEADER_SIZE
+    ticker = np.ndarray((len(_TICKER_FIELDS) + 1,), np.float64, buffer, offset)
+    offset += 8 * (len(_TICKER_FIELDS) + 1)
+    bids = np.ndarray((depth, 2), np.float64, buffer, offset)
+    asks = np.ndarray((depth, 2), np.float64, buffer, offset + 16 * depth)
+    return header, ticker, bids, asks
+
+
+class SharedOrderbookPublisher:
+    def __init__(self, market: str, depth: int, prefix: str = 'ftx') -> None:
+        self._depth = depth
+        self._lock = Lock()
+        self._memory = SharedMemory(get_shared_memory_name(market, prefix), create=True, size=_get_size(depth))
+        self._header, self._ticker, self._bids, self._asks = _get_views(self._memory.buf, depth)
+        self._header[:] = (0, depth, os.getpid())
+        self._ticker[:] = np.nan
+        self._bids[:] = np.nan
+        self._asks[:] = np.nan
+
+    def get_depth(self) -> int:
+        return self._depth
+
+    def publish_orderbook(self, bids: List[Tuple[float, float]], asks: List[Tuple[float, float]],
+                          time: float) -> None:
+        with self._lock:
+            header = self._header
+            if header is None:
+                return
+            header[0] += 1
+            for levels, array in ((bids, self._bids), (asks, self._asks)):
+                if levels:
+                    array[:len(levels)] = levels
+                array[len(levels):] = np.nan
+            self._ticker[-1] = time
+            header[0] += 1
+
+    def publish_ticker(self, ticker: Dict) -> None:
+        with self._lock:
+            header = self._header
+            if header is None:
+                return
+            header[0] += 1
+            self._ticker[:-1] = [np.nan if ticker.get(field) is None else ticker[field] for field in _TICKER_FIELDS]
+            header[0] += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._header is None:
+                return
+            self._header = self._ticker = self._bids = self._asks = None
+        self._memory.close()
+        self._memory.unlink()
+
+
+class SharedOrderbookReader:
+    _MAX_RETRIES = 1000
+
+    def __init__(self, market: str, prefix: str = 'ftx') -> None:
+        name = get_shared_memory_name(market, prefix)
+        if sys.version_info >= (3, 13):
+            self._memory = SharedMemory(name, track=False)
+        else:
+            self._memory = SharedMemory(name)
+        _, depth, publisher_pid = (int(value) for value in np.ndarray((_HEADER_SIZE,), np.int64, self._memory.buf))
+        if sys.version_info < (3, 13) and os.name == 'posix' and not _is_own_process_tree(publisher_pid):
+            resource_tracker.unregister(f'/{self._memory.name}', 'shared_memory')
+        self._header, self._ticker, self._bids, self._asks = _get_views(self._memory.buf, depth)
+        self._snapshot_ticker = np.empty_like(self._ticker)
+        self._snapshot = {
+            'bids': np.empty_like(self._bids),
+            'asks': np.empty_like(self._asks),
+        }
+
+    def read(self) -> Optional[Dict]:
+        header, snapshot = self._header, self._snapshot
+        for _ in range(self._MAX_RETRIES):
+            version = int(header[0])
+            if version & 1:
+                continue
+            np.copyto(snapshot['bids'], self._bids)
+            np.copyto(snapshot['asks'], self._asks)
+            np.copyto(self._snapshot_ticker, self._ticker)
+            if int(header[0]) == version:
+                snapshot['version'] = version
+                snapshot['time'] = float(self._snapshot_ticker[-1])
+                snapshot['ticker'] = dict(zip(_TICKER_FIELDS, self._snapshot_ticker[:-1].tolist()))
+                return snapshot
+        return None
+
+    def close(self) -> None:
+        self._header = self._ticker = self._bids = self._asks = None
+        self._memory.close()
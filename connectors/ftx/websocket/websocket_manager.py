@@ -1,20 +1,36 @@
 import json
+import random
 import time
-from threading import Thread, Lock
+from threading import Event, Thread, Lock
+from typing import Dict, Optional
 from websocket import WebSocketApp
 
 
 class FtxWebSocketManager:
     _CONNECT_TIMEOUT_SECONDS = 5
+    _RECONNECT_BACKOFF_SECONDS = 0.5
+    _MAX_RECONNECT_BACKOFF_SECONDS = 30
+    _STABLE_CONNECTION_SECONDS = 10
     _BASE_URL = 'wss://ftx.com/ws/'
 
     def __init__(self):
         self.connect_lock = Lock()
         self.ws = None
+        self._open_event = Event()
+        self._connect_failures = 0
+        self._connected_at: Optional[float] = None
+        self._disconnected_at: Optional[float] = None
+        self._connection_stats = {
+            'connects': 0, 'reconnects': 0, 'connect_failures': 0,
+            'last_reconnect_gap': 0.0, 'max_reconnect_gap': 0.0, 'total_reconnect_gap': 0.0,
+        }
 
     def _get_url(self):
         return self._BASE_URL
 
+    def _on_open(self, ws):
+        pass
+
     def _on_message(self, ws, message):
         print(message)
         raise NotImplementedError
@@ -29,23 +45,64 @@ class FtxWebSocketManager:
     def _connect(self):
         assert not self.ws, 'ws should be closed before attempting to connect'
 
-        self.ws = WebSocketApp(
+        self._open_event = open_event = Event()
+        self.ws = ws = WebSocketApp(
             self._get_url(),
+            on_open=self._wrap_callback(self._handle_open),
             on_message=self._wrap_callback(self._on_message),
             on_close=self._wrap_callback(self._on_close),
             on_error=self._wrap_callback(self._on_error)
         )
 
-        wst = Thread(target=self._run_websocket, args=(self.ws,))
+        wst = Thread(target=self._run_websocket, args=(ws,))
         wst.daemon = True
         wst.start()
 
-        ts = time.time()
-        while self.ws and (not self.ws.sock or not self.ws.sock.connected):
-            if time.time() - ts > self._CONNECT_TIMEOUT_SECONDS:
+        open_event.wait(self._CONNECT_TIMEOUT_SECONDS)
+        if self.ws is not ws or not ws.sock or not ws.sock.connected:
+            if self.ws is ws:
                 self.ws = None
-                return
-            time.sleep(0.1)
+                ws.close()
+
+    def _handle_open(self, ws):
+        self._record_connected()
+        try:
+            self._on_open(ws)
+        finally:
+            self._open_event.set()
+
+    def _record_connected(self) -> None:
+        self._connected_at = time.time()
+        stats = self._connection_stats
+        stats['connects'] += 1
+        if self._disconnected_at is not None:
+            gap = time.time() - self._disconnected_at
+            self._disconnected_at = None
+            stats['reconnects'] += 1
+            stats['last_reconnect_gap'] = gap
+            stats['max_reconnect_gap'] = max(stats['max_reconnect_gap'], gap)
+            stats['total_reconnect_gap'] += gap
+
+    def _record_disconnected(self) -> None:
+        if self._disconnected_at is None:
+            self._disconnected_at = now = time.time()
+            if self._connected_at is not None and now - self._connected_at >= self._STABLE_CONNECTION_SECONDS:
+                self._connect_failures = 0
+            else:
+                self._connect_failures += 1
+            self._connected_at = None
+
+    def _record_connect_failure(self) -> None:
+        self._connect_failures += 1
+        self._connection_stats['connect_failures'] += 1
+
+    def _get_reconnect_delay(self) -> float:
+        backoff = min(self._MAX_RECONNECT_BACKOFF_SECONDS,
+                      self._RECONNECT_BACKOFF_SECONDS * 2 ** max(self._connect_failures - 1, 0))
+        return random.uniform(backoff / 2, backoff)
+
+    def get_connection_stats(self) -> Dict[str, float]:
+        return dict(self._connection_stats, connected=self.ws is not None and self._open_event.is_set())
 
     def _wrap_callback(self, f):
         def wrapped_f(ws, *args, **kwargs):
@@ -69,7 +126,12 @@ class FtxWebSocketManager:
         if ws is self.ws:
             self.ws = None
             ws.close()
-            self.connect()
+            if self._open_event.is_set():
+                self._record_disconnected()
+                time.sleep(self._get_reconnect_delay())
+                self.connect()
+            else:
+                self._open_event.set()
 
     def connect(self):
         if self.ws:
@@ -79,6 +141,8 @@ class FtxWebSocketManager:
                 self._connect()
                 if self.ws:
                     return
+                self._record_connect_failure()
+                time.sleep(self._get_reconnect_delay())
 
     def _on_close(self, ws):
         self._reconnect(ws)
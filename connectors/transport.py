@@ -0,0 +1,46 @@
+from threading import Lock
+from typing import Dict, Optional, Tuple, Union
+from requests import PreparedRequest, Request, Response, Session
+from requests.adapters import HTTPAdapter
+
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 64
+DEFAULT_TIMEOUT: Timeout = (3.05, 10)
+
+
+class HttpTransport:
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 timeout: Timeout = DEFAULT_TIMEOUT, max_retries: int = 0) -> None:
+        self._timeout = timeout
+        self._session = Session()
+        self._session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def get_headers(self) -> Dict[str, str]:
+        return dict(self._session.headers)
+
+    def send(self, request: Request, timeout: Optional[Timeout] = None) -> Response:
+        return self.send_prepared(self._session.prepare_request(request), timeout)
+
+    def send_prepared(self, prepared: PreparedRequest, timeout: Optional[Timeout] = None) -> Response:
+        return self._session.send(prepared, timeout=self._timeout if timeout is None else timeout)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_transport_lock = Lock()
+
+
+def get_transport() -> HttpTransport:
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_transport_lock:
+            if _shared_transport is None:
+                _shared_transport = HttpTransport()
+    return _shared_transport
@@ -30,8 +30,6 @@ if __name__ == '__main__':
 
     ftx = FtxClient(api_key, api_secret)
     websocket = FtxWebSocketClient(api_key, api_secret)
-    result = websocket.get_ticker('BTC-PERP')
-    while True:
-        btc_perp = websocket.get_ticker('BTC-PERP')
-        print(btc_perp)
+    for message in websocket.stream('ticker', 'BTC-PERP'):
+        print(message['data'])
 